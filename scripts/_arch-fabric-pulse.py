@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import argparse
 import difflib
-import json
 import shutil
-import subprocess
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, replace
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from rich import box
 from rich.console import Console
@@ -21,9 +22,40 @@ from rich.table import Table
 
 import pyeapi
 
+try:
+    import patiencediff
+except ImportError:
+    patiencediff = None
+
+from _eapi_cli import add_common_eapi_args, non_negative_int
+from _eapi_session import keep_alive, set_timeout
+from _inventory import load_inventory
+
 
 console = Console()
 
+MAX_BACKOFF = 60.0
+LARGE_CONFIG_LINES = 5000
+CONFIG_TIMEOUT = 30
+# "show processes top once" runs top on the switch; in --watch it only joins the
+# snapshot batch once a device's last CPU reading is this many seconds old.
+CPU_REFRESH = 30.0
+
+SNAPSHOT_COMMANDS = [
+    "show version",
+    "show system environment temperature",
+    "show ip bgp summary",
+    "show mlag",
+]
+CPU_COMMAND = "show processes top once"
+
+_NODES: dict[str, Any] = {}
+_GOLDEN_CACHE: dict[str, tuple[int, list[str]]] = {}
+_BACKOFF: dict[str, tuple[float, float, str]] = {}
+_LAST_SNAPSHOT: dict[str, tuple[float, Snapshot]] = {}
+_CPU_READING: dict[str, tuple[float, str]] = {}
+_NODES_LOCK = threading.Lock()
+
 
 @dataclass
 class Device:
@@ -43,17 +75,14 @@ class Snapshot:
     mlag: str
     reachable: bool
     error: str = ""
+    stale: bool = False
+    age: float = 0.0
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Arista Fabric Pulse - health dashboard and drift warden")
-    parser.add_argument("--inventory", default="inventory/inventory.yml", help="Ansible inventory path")
-    parser.add_argument("--group", default="FABRIC", help="Inventory group to monitor")
-    parser.add_argument("--username", default="admin", help="eAPI username")
-    parser.add_argument("--password", default="admin", help="eAPI password")
-    parser.add_argument("--port", type=int, default=443, help="eAPI TCP port")
-    parser.add_argument("--insecure", action="store_true", help="Disable SSL verification")
-    parser.add_argument("--transport", choices=["http", "https"], default="https", help="eAPI transport")
+    add_common_eapi_args(parser, group="FABRIC")
+    parser.add_argument("--insecure", action="store_true", help="Accepted for compatibility; certificates are never verified")
     parser.add_argument("--golden-dir", default="build/configs", help="Directory containing <hostname>.cfg golden configs")
     parser.add_argument(
         "--flash-dir",
@@ -63,43 +92,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--watch", action="store_true", help="Live refresh dashboard until Ctrl+C")
     parser.add_argument("--interval", type=float, default=3.0, help="Refresh interval for --watch")
     parser.add_argument("--no-restore", action="store_true", help="Detect/report drift but never ask to restore")
-    parser.add_argument("--max-diff-lines", type=int, default=120, help="Max diff lines shown per device")
+    parser.add_argument("--max-diff-lines", type=non_negative_int, default=120, help="Max diff lines shown per device")
     return parser.parse_args()
 
 
-def load_inventory_devices(inventory_path: str, group: str) -> list[Device]:
-    command = ["ansible-inventory", "-i", inventory_path, "--list"]
-    proc = subprocess.run(command, capture_output=True, text=True, check=False)
-    if proc.returncode != 0:
-        raise RuntimeError(f"Failed to run ansible-inventory: {proc.stderr.strip()}")
-
-    inv = json.loads(proc.stdout)
-    if group not in inv:
-        raise RuntimeError(f"Group '{group}' not found in inventory")
-
-    def collect_hosts(group_name: str, seen: set[str] | None = None) -> set[str]:
-        if seen is None:
-            seen = set()
-        if group_name in seen:
-            return set()
-        seen.add(group_name)
-
-        group_data = inv.get(group_name, {})
-        hosts = set(group_data.get("hosts", []))
-        for child in group_data.get("children", []):
-            hosts.update(collect_hosts(child, seen))
-        return hosts
+def load_inventory_devices(inventory_path: str, group: str, refresh: bool = False, fast: bool = False) -> list[Device]:
+    hosts = load_inventory(inventory_path, group, refresh=refresh, fast=fast)
+    return [Device(name=hostname, host=host_ip) for hostname, host_ip in hosts]
 
-    group_hosts = sorted(collect_hosts(group))
-    hostvars = inv.get("_meta", {}).get("hostvars", {})
-    devices: list[Device] = []
-    for hostname in group_hosts:
-        host_ip = hostvars.get(hostname, {}).get("ansible_host", hostname)
-        devices.append(Device(name=hostname, host=host_ip))
-    return devices
 
-
-def node_for_device(device: Device, args: argparse.Namespace):
+def node_for_device(device: Device, args: argparse.Namespace, timeout: float = 30):
     return pyeapi.client.connect(
         transport=args.transport,
         host=device.host,
@@ -107,12 +109,30 @@ def node_for_device(device: Device, args: argparse.Namespace):
         password=args.password,
         port=args.port,
         return_node=True,
-        timeout=30,
+        timeout=timeout,
     )
 
 
-def command_json(node: Any, command: str) -> dict[str, Any]:
-    response = node.enable([command])[0]
+def get_or_create_node(device: Device, args: argparse.Namespace) -> Any:
+    with _NODES_LOCK:
+        node = _NODES.get(device.name)
+        if node is None:
+            node = keep_alive(node_for_device(device, args, timeout=max(5, args.interval)))
+            _NODES[device.name] = node
+        return node
+
+
+def evict_node(device: Device) -> None:
+    with _NODES_LOCK:
+        _NODES.pop(device.name, None)
+
+
+def evict_all_nodes() -> None:
+    with _NODES_LOCK:
+        _NODES.clear()
+
+
+def result_json(response: Any) -> dict[str, Any]:
     if isinstance(response, dict) and "result" in response and isinstance(response["result"], dict):
         return response["result"]
     if isinstance(response, dict):
@@ -120,6 +140,30 @@ def command_json(node: Any, command: str) -> dict[str, Any]:
     return {}
 
 
+def command_json(node: Any, command: str) -> dict[str, Any]:
+    return result_json(node.enable([command])[0])
+
+
+def run_snapshot_commands(node: Any, commands: list[str]) -> list[dict[str, Any] | None]:
+    # strict=True makes pyeapi send the whole list in one eAPI request instead of
+    # one request per command.
+    try:
+        return [result_json(response) for response in node.enable(commands, strict=True)]
+    except pyeapi.eapilib.CommandError:
+        pass
+
+    # eAPI aborts the whole batch on the first failing command, so fall back to
+    # one request per command and only lose the readings that actually failed.
+    version_command, *other_commands = commands
+    results: list[dict[str, Any] | None] = [command_json(node, version_command)]
+    for command in other_commands:
+        try:
+            results.append(command_json(node, command))
+        except pyeapi.eapilib.CommandError:
+            results.append(None)
+    return results
+
+
 def command_text(node: Any, command: str) -> str:
     response = node.enable([command], encoding="text")[0]
     if isinstance(response, dict):
@@ -145,29 +189,27 @@ def format_uptime(seconds: Any) -> str:
     return f"{days}d {hours}h {minutes}m"
 
 
-def read_cpu(node: Any) -> str:
+def read_cpu(output: dict[str, Any] | None) -> str:
+    if output is None:
+        return "n/a"
     try:
-        output = command_json(node, "show processes top once")
-        for key in ("cpu", "cpuUtilization", "cpuTotal"):
-            value = output.get(key)
-            if isinstance(value, (int, float)):
-                return f"{value:.1f}%"
+        idle = output.get("cpuInfo", {}).get("%Cpu(s)", {}).get("idle")
+        if isinstance(idle, (int, float)):
+            return f"{100.0 - idle:.1f}%"
     except Exception:
         return "n/a"
     return "n/a"
 
 
-def read_temperature(node: Any) -> str:
+def read_temperature(output: dict[str, Any] | None) -> str:
+    if output is None:
+        return "n/a"
     try:
-        output = command_json(node, "show system environment temperature")
-        temperatures = []
-        for section in ("cardSlots", "powerSupplySlots", "tempSensors"):
-            items = output.get(section, {})
-            if isinstance(items, dict):
-                for _, item in items.items():
-                    value = item.get("currentTemperature")
-                    if isinstance(value, (int, float)):
-                        temperatures.append(float(value))
+        sections = [output.get(section) for section in ("cardSlots", "powerSupplySlots", "tempSensors")]
+        readings = [
+            item.get("currentTemperature") for items in sections if isinstance(items, dict) for item in items.values()
+        ]
+        temperatures = [value for value in readings if isinstance(value, (int, float))]
         if temperatures:
             return f"{max(temperatures):.1f}C"
     except Exception:
@@ -175,28 +217,24 @@ def read_temperature(node: Any) -> str:
     return "n/a"
 
 
-def read_bgp_status(node: Any) -> str:
+def read_bgp_status(output: dict[str, Any] | None) -> str:
+    if output is None:
+        return "n/a"
     try:
-        output = command_json(node, "show ip bgp summary")
         vrfs = output.get("vrfs", {})
-        established = 0
-        total = 0
-        for vrf_data in vrfs.values():
-            peers = vrf_data.get("peers", {})
-            total += len(peers)
-            for peer_data in peers.values():
-                if peer_data.get("peerState") == "Established":
-                    established += 1
-        if total == 0:
+        peers = [peer_data for vrf_data in vrfs.values() for peer_data in vrf_data.get("peers", {}).values()]
+        if not peers:
             return "n/a"
-        return f"{established}/{total} up"
+        established = sum(1 for peer_data in peers if peer_data.get("peerState") == "Established")
+        return f"{established}/{len(peers)} up"
     except Exception:
         return "n/a"
 
 
-def read_mlag_status(node: Any) -> str:
+def read_mlag_status(output: dict[str, Any] | None) -> str:
+    if output is None:
+        return "n/a"
     try:
-        output = command_json(node, "show mlag")
         state = output.get("state") or output.get("mlagState")
         if state:
             return str(state)
@@ -235,38 +273,65 @@ def mlag_color(state: str) -> str:
     return "red"
 
 
+def unreachable_snapshot(device: Device, error: str) -> Snapshot:
+    last = _LAST_SNAPSHOT.get(device.name)
+    if last is not None:
+        collected_at, snapshot = last
+        return replace(snapshot, error=error, stale=True, age=time.monotonic() - collected_at)
+    return Snapshot(
+        name=device.name,
+        model="n/a",
+        version="n/a",
+        uptime="n/a",
+        cpu="n/a",
+        temperature="n/a",
+        bgp="n/a",
+        mlag="n/a",
+        reachable=False,
+        error=error,
+    )
+
+
 def collect_snapshot(device: Device, args: argparse.Namespace) -> Snapshot:
+    backoff = _BACKOFF.get(device.name)
+    if backoff is not None and time.monotonic() < backoff[0]:
+        return unreachable_snapshot(device, backoff[2])
+
     try:
-        node = node_for_device(device, args)
-        version = command_json(node, "show version")
-        cpu = read_cpu(node)
-        temp = read_temperature(node)
-        bgp = read_bgp_status(node)
-        mlag = read_mlag_status(node)
-        return Snapshot(
+        node = get_or_create_node(device, args)
+        cpu_reading = _CPU_READING.get(device.name)
+        cpu_due = cpu_reading is None or time.monotonic() - cpu_reading[0] >= CPU_REFRESH
+        commands = SNAPSHOT_COMMANDS + [CPU_COMMAND] if cpu_due else SNAPSHOT_COMMANDS
+        version, temp, bgp, mlag, *cpu = run_snapshot_commands(node, commands)
+        if cpu_due:
+            cpu_reading = (time.monotonic(), read_cpu(cpu[0]))
+            _CPU_READING[device.name] = cpu_reading
+        snapshot = Snapshot(
             name=device.name,
             model=str(version.get("modelName", "n/a")),
             version=str(version.get("version", "n/a")),
             uptime=format_uptime(version.get("uptime")),
-            cpu=cpu,
-            temperature=temp,
-            bgp=bgp,
-            mlag=mlag,
+            cpu=cpu_reading[1],
+            temperature=read_temperature(temp),
+            bgp=read_bgp_status(bgp),
+            mlag=read_mlag_status(mlag),
             reachable=True,
         )
     except Exception as exc:
-        return Snapshot(
-            name=device.name,
-            model="n/a",
-            version="n/a",
-            uptime="n/a",
-            cpu="n/a",
-            temperature="n/a",
-            bgp="n/a",
-            mlag="n/a",
-            reachable=False,
-            error=str(exc),
-        )
+        evict_node(device)
+        delay = min(backoff[1] * 2, MAX_BACKOFF) if backoff is not None else args.interval
+        _BACKOFF[device.name] = (time.monotonic() + delay, delay, str(exc))
+        return unreachable_snapshot(device, str(exc))
+
+    _BACKOFF.pop(device.name, None)
+    _LAST_SNAPSHOT[device.name] = (time.monotonic(), snapshot)
+    return snapshot
+
+
+def submit_snapshots(
+    executor: ThreadPoolExecutor, devices: list[Device], args: argparse.Namespace
+) -> list[Future[Snapshot]]:
+    return [executor.submit(collect_snapshot, device, args) for device in devices]
 
 
 def build_dashboard(snapshots: list[Snapshot]) -> Table:
@@ -296,6 +361,9 @@ def build_dashboard(snapshots: list[Snapshot]) -> Table:
             )
             continue
 
+        status = "[bold green]OK[/bold green]"
+        if snap.stale:
+            status = f"[yellow]STALE {snap.age:.0f}s[/yellow] {snap.error}"
         health = health_color(snap.cpu, snap.temperature)
         bgp_style = "green" if snap.bgp.endswith("up") and not snap.bgp.startswith("0/") else "yellow"
         table.add_row(
@@ -307,7 +375,7 @@ def build_dashboard(snapshots: list[Snapshot]) -> Table:
             f"[{health}]{snap.temperature}[/{health}]",
             f"[{bgp_style}]{snap.bgp}[/{bgp_style}]",
             f"[{mlag_color(snap.mlag)}]{snap.mlag}[/{mlag_color(snap.mlag)}]",
-            "[bold green]OK[/bold green]",
+            status,
         )
     return table
 
@@ -316,55 +384,95 @@ def golden_file_path(golden_dir: Path, hostname: str) -> Path:
     return golden_dir / f"{hostname}.cfg"
 
 
-def running_config(node: Any) -> str:
-    text = command_text(node, "show running-config")
-    return "\n".join(line.rstrip() for line in text.splitlines()).strip() + "\n"
+def config_lines(text: str) -> list[str]:
+    return [line.rstrip() for line in text.strip().splitlines()]
 
 
-def load_golden_config(path: Path) -> str:
-    return "\n".join(path.read_text(encoding="utf-8").splitlines()).strip() + "\n"
+def running_config_lines(node: Any) -> list[str]:
+    return config_lines(command_text(node, "show running-config"))
 
 
-def config_diff(golden: str, running: str, hostname: str) -> list[str]:
-    return list(
-        difflib.unified_diff(
-            golden.splitlines(),
-            running.splitlines(),
-            fromfile=f"golden/{hostname}.cfg",
-            tofile=f"running/{hostname}",
-            lineterm="",
-            n=2,
+def load_golden_lines(path: Path) -> list[str]:
+    return config_lines(path.read_text(encoding="utf-8"))
+
+
+def cached_golden_lines(hostname: str, path: Path) -> list[str]:
+    mtime = path.stat().st_mtime_ns
+    cached = _GOLDEN_CACHE.get(hostname)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    golden_lines = load_golden_lines(path)
+    _GOLDEN_CACHE[hostname] = (mtime, golden_lines)
+    return golden_lines
+
+
+def config_diff(golden_lines: list[str], running_lines: list[str], hostname: str) -> Iterator[str]:
+    options: dict[str, Any] = {
+        "fromfile": f"golden/{hostname}.cfg",
+        "tofile": f"running/{hostname}",
+        "lineterm": "",
+        "n": 2,
+    }
+    # difflib's pure-Python matcher gets slow on very large configs; patiencediff
+    # (optional C extension) produces the same unified format much faster.
+    if patiencediff is not None and max(len(golden_lines), len(running_lines)) > LARGE_CONFIG_LINES:
+        return patiencediff.unified_diff(
+            golden_lines, running_lines, sequencematcher=patiencediff.PatienceSequenceMatcher, **options
         )
-    )
+    return difflib.unified_diff(golden_lines, running_lines, **options)
 
 
-def detect_drift(devices: list[Device], args: argparse.Namespace) -> dict[str, dict[str, Any]]:
-    golden_dir = Path(args.golden_dir)
-    results: dict[str, dict[str, Any]] = {}
-    for device in devices:
-        result: dict[str, Any] = {
-            "drift": False,
-            "reason": "",
-            "diff": [],
-            "golden_path": str(golden_file_path(golden_dir, device.name)),
-        }
-        path = golden_file_path(golden_dir, device.name)
-        if not path.exists():
-            result["reason"] = "Golden config missing"
-            results[device.name] = result
-            continue
+def check_drift(device: Device, args: argparse.Namespace) -> dict[str, Any]:
+    path = golden_file_path(Path(args.golden_dir), device.name)
+    result: dict[str, Any] = {
+        "drift": False,
+        "reason": "",
+        "diff": [],
+        "diff_overflow": 0,
+        "golden_path": str(path),
+    }
+    if not path.exists():
+        result["reason"] = "Golden config missing"
+        return result
 
-        try:
-            node = node_for_device(device, args)
-            running = running_config(node)
-            golden = load_golden_config(path)
-            diff = config_diff(golden, running, device.name)
-            result["diff"] = diff
-            result["drift"] = len(diff) > 0
-        except Exception as exc:
-            result["reason"] = f"Error reading running-config: {exc}"
-        results[device.name] = result
-    return results
+    try:
+        node = get_or_create_node(device, args)
+        # Kept-alive nodes carry the short snapshot timeout; a full running-config
+        # needs the longer one.
+        set_timeout(node, CONFIG_TIMEOUT)
+        running_lines = running_config_lines(node)
+        golden_lines = cached_golden_lines(device.name, path)
+        if running_lines == golden_lines:
+            return result
+        diff = config_diff(golden_lines, running_lines, device.name)
+        result["diff"] = list(islice(diff, args.max_diff_lines))
+        result["diff_overflow"] = sum(1 for _ in diff)
+        result["drift"] = bool(result["diff"]) or result["diff_overflow"] > 0
+    except Exception as exc:
+        evict_node(device)
+        result["reason"] = f"Error reading running-config: {exc}"
+    return result
+
+
+def detect_drift(
+    executor: ThreadPoolExecutor, devices: list[Device], args: argparse.Namespace
+) -> dict[str, dict[str, Any]]:
+    results = executor.map(lambda device: check_drift(device, args), devices)
+    return {device.name: result for device, result in zip(devices, results)}
+
+
+def collect_snapshots_and_drift(
+    executor: ThreadPoolExecutor, devices: list[Device], args: argparse.Namespace
+) -> tuple[list[Snapshot], dict[str, Future[dict[str, Any]]]]:
+    # Queue each device's drift check as soon as its snapshot is in, so drift runs
+    # while slower devices are still answering. Both share the device's connection,
+    # so the two never overlap on the same device.
+    snapshot_futures = {executor.submit(collect_snapshot, device, args): device for device in devices}
+    drift_futures = {}
+    for future in as_completed(snapshot_futures):
+        device = snapshot_futures[future]
+        drift_futures[device.name] = executor.submit(check_drift, device, args)
+    return [future.result() for future in snapshot_futures], drift_futures
 
 
 def build_drift_table(drift_data: dict[str, dict[str, Any]]) -> Table:
@@ -376,7 +484,7 @@ def build_drift_table(drift_data: dict[str, dict[str, Any]]) -> Table:
     for device, info in drift_data.items():
         if info["drift"]:
             state = "[bold red]DRIFT[/bold red]"
-            reason = f"{len(info['diff'])} diff lines"
+            reason = f"{len(info['diff']) + info['diff_overflow']} diff lines"
         elif info["reason"]:
             state = "[yellow]UNKNOWN[/yellow]"
             reason = info["reason"]
@@ -410,51 +518,45 @@ def restore_golden(device: Device, args: argparse.Namespace) -> tuple[bool, str]
         return False, str(exc)
 
 
-def display_diff(device: str, diff_lines: list[str], max_lines: int) -> None:
+def display_diff(device: str, diff_lines: list[str], overflow: int) -> None:
     if not diff_lines:
         return
-    preview = diff_lines[:max_lines]
     suffix = ""
-    if len(diff_lines) > max_lines:
-        suffix = f"\n... ({len(diff_lines) - max_lines} more lines)"
-    body = "\n".join(preview) + suffix
+    if overflow:
+        suffix = f"\n... ({overflow} more lines)"
+    body = "\n".join(diff_lines) + suffix
     console.print(Panel(body, title=f"Diff: {device}", border_style="red"))
 
 
-def main() -> int:
-    args = parse_args()
-
-    console.print("[bold cyan]Starting Arista Fabric Pulse[/bold cyan]")
-    try:
-        devices = load_inventory_devices(args.inventory, args.group)
-    except Exception as exc:
-        console.print(f"[bold red]Inventory load failed:[/bold red] {exc}")
-        return 2
-
-    if not devices:
-        console.print("[bold red]No devices found in selected inventory group.[/bold red]")
-        return 2
-
+def run(executor: ThreadPoolExecutor, devices: list[Device], args: argparse.Namespace) -> int:
     if args.watch:
-        with Live(console=console, refresh_per_second=max(1, int(1 / max(0.1, args.interval)))) as live:
+        with Live(console=console, auto_refresh=False) as live:
+            futures: list[Future[Snapshot]] = []
             try:
                 while True:
-                    snapshots = [collect_snapshot(device, args) for device in devices]
-                    live.update(build_dashboard(snapshots))
+                    futures = submit_snapshots(executor, devices, args)
+                    snapshots = [future.result() for future in futures]
+                    live.update(build_dashboard(snapshots), refresh=True)
                     time.sleep(args.interval)
             except KeyboardInterrupt:
-                pass
+                # Snapshots already running still hold their device's connection;
+                # let them finish before the drift check reuses it.
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+        console.print("\n[bold magenta]Detect -> Report[/bold magenta]")
+        drift_data = detect_drift(executor, devices, args)
     else:
-        snapshots = [collect_snapshot(device, args) for device in devices]
+        snapshots, drift_futures = collect_snapshots_and_drift(executor, devices, args)
         console.print(build_dashboard(snapshots))
+        console.print("\n[bold magenta]Detect -> Report[/bold magenta]")
+        drift_data = {device.name: drift_futures[device.name].result() for device in devices}
 
-    console.print("\n[bold magenta]Detect -> Report[/bold magenta]")
-    drift_data = detect_drift(devices, args)
     console.print(build_drift_table(drift_data))
 
     drifted = [d for d in devices if drift_data[d.name]["drift"]]
     for device in drifted:
-        display_diff(device.name, drift_data[device.name]["diff"], args.max_diff_lines)
+        display_diff(device.name, drift_data[device.name]["diff"], drift_data[device.name]["diff_overflow"])
 
     if args.no_restore or not drifted:
         if drifted:
@@ -470,25 +572,52 @@ def main() -> int:
 
     console.print("\n[bold magenta]Fix -> Verify[/bold magenta]")
     all_ok = True
-    for device in drifted:
-        ok, message = restore_golden(device, args)
+    restored = list(executor.map(lambda device: restore_golden(device, args), drifted))
+    for device, (ok, message) in zip(drifted, restored):
         if ok:
             console.print(f"[green]{device.name}[/green]: {message}")
         else:
             all_ok = False
             console.print(f"[red]{device.name}[/red]: {message}")
 
-    post_drift = detect_drift(drifted, args)
+    # The cached connections sat idle through the prompt and the config replace;
+    # verify over fresh ones.
+    evict_all_nodes()
+    post_drift = detect_drift(executor, drifted, args)
     console.print(build_drift_table(post_drift))
     remaining = [name for name, info in post_drift.items() if info["drift"]]
+    unverified = [name for name, info in post_drift.items() if not info["drift"] and info["reason"]]
     if remaining:
         all_ok = False
         console.print(f"[red]Drift still present on: {', '.join(remaining)}[/red]")
-    else:
+    if unverified:
+        all_ok = False
+        console.print(f"[yellow]Could not verify restore on: {', '.join(unverified)}[/yellow]")
+    if not remaining and not unverified:
         console.print("[bold green]Fabric restored to Golden State.[/bold green]")
 
     return 0 if all_ok else 1
 
 
+def main() -> int:
+    args = parse_args()
+
+    console.print("[bold cyan]Starting Arista Fabric Pulse[/bold cyan]")
+    try:
+        devices = load_inventory_devices(
+            args.inventory, args.group, refresh=args.refresh_inventory, fast=args.fast_inventory
+        )
+    except Exception as exc:
+        console.print(f"[bold red]Inventory load failed:[/bold red] {exc}")
+        return 2
+
+    if not devices:
+        console.print("[bold red]No devices found in selected inventory group.[/bold red]")
+        return 2
+
+    with ThreadPoolExecutor(max_workers=min(args.max_workers, len(devices))) as executor:
+        return run(executor, devices, args)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""Shared command-line options for the eAPI scripts.
+
+Every script talks to the same lab devices, so inventory selection, eAPI
+credentials/transport and the size of the worker pool are defined once here.
+"""
+
+import argparse
+import os
+
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def positive_int(value: str) -> int:
+	"""argparse type for options that must be at least 1."""
+	number = int(value)
+	if number < 1:
+		raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+	return number
+
+
+def non_negative_int(value: str) -> int:
+	"""argparse type for options that must be at least 0."""
+	number = int(value)
+	if number < 0:
+		raise argparse.ArgumentTypeError(f"must be >= 0, got {value}")
+	return number
+
+
+def add_common_eapi_args(parser: argparse.ArgumentParser, group: str = "FABRIC") -> argparse.ArgumentParser:
+	"""Add inventory, eAPI connection and concurrency options to a parser."""
+	parser.add_argument("--inventory", default="inventory/inventory.yml", help="Path to Ansible inventory")
+	parser.add_argument("--group", default=group, help="Inventory group name")
+	parser.add_argument(
+		"--refresh-inventory", action="store_true", help="Reload the inventory instead of using the cached copy"
+	)
+	parser.add_argument(
+		"--fast-inventory",
+		action="store_true",
+		help="Parse a static YAML inventory directly instead of through Ansible (ignores group_vars/host_vars)",
+	)
+	parser.add_argument("--username", default="admin", help="eAPI username")
+	parser.add_argument("--password", default="admin", help="eAPI password")
+	parser.add_argument("--transport", choices=["http", "https"], default="https", help="eAPI transport")
+	parser.add_argument("--port", type=int, default=443, help="eAPI port")
+	parser.add_argument(
+		"--max-workers",
+		type=positive_int,
+		default=DEFAULT_MAX_WORKERS,
+		help=f"Maximum number of devices queried in parallel (default: {DEFAULT_MAX_WORKERS})",
+	)
+	return parser
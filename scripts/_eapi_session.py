@@ -0,0 +1,98 @@
+"""Connection helpers for pyeapi nodes.
+
+pyeapi closes its HTTP(S) connection after every request, so each call pays a
+new TCP (and TLS) handshake. `keep_alive()` keeps the socket open between
+requests and only closes it when the switch asks for it or a request fails.
+If the switch has dropped an idle socket, the request is sent again once on a
+fresh connection. A kept-alive node must not be used from more than one thread at a time.
+
+Without an explicit `context`, pyeapi also builds a new unverified SSL context
+for every HTTPS connection; `shared_ssl_context()` returns one that all
+connections can reuse.
+"""
+
+import functools
+import http.client
+import select
+import ssl
+from typing import Any
+
+import pyeapi
+
+
+# Errors raised when a reused socket was closed by the switch before it replied.
+RETRYABLE_ERRORS = (BrokenPipeError, ConnectionResetError, http.client.RemoteDisconnected)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_ssl_context() -> ssl.SSLContext:
+	"""Return one unverified SSL context, matching pyeapi's default for lab switches."""
+	context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+	context.check_hostname = False
+	context.verify_mode = ssl.CERT_NONE
+	return context
+
+
+def set_timeout(node: Any, timeout: float) -> None:
+	"""Change a node's socket timeout, including on an already open connection."""
+	transport = node.connection.transport
+	transport.timeout = timeout
+	if transport.sock is not None:
+		transport.sock.settimeout(timeout)
+
+
+def socket_dropped(sock: Any) -> bool:
+	"""Return True if an idle socket is readable, i.e. the peer closed it."""
+	readable, _, _ = select.select([sock], [], [], 0)
+	return bool(readable)
+
+
+def keep_alive(node: Any) -> Any:
+	"""Make a pyeapi node reuse its connection across requests; returns the node."""
+	connection = node.connection
+	transport = connection.transport
+	close = transport.close
+	getresponse = transport.getresponse
+	send = connection.send
+	state = {"responded": False}
+
+	def guarded_getresponse(*args: Any, **kwargs: Any) -> Any:
+		response = getresponse(*args, **kwargs)
+		state["responded"] = True
+		if response.will_close:
+			close()
+		return response
+
+	def guarded_send(data: str) -> Any:
+		# A failure anywhere in the exchange, including the body read after
+		# getresponse(), can leave a half-read response on the connection; start
+		# the next request on a fresh one. An eAPI error reply has been read in
+		# full, so the connection stays usable.
+		try:
+			return send(data)
+		except pyeapi.eapilib.CommandError:
+			raise
+		except Exception:
+			close()
+			raise
+
+	def retrying_send(data: str) -> Any:
+		# Switches drop idle keep-alive sockets. Reconnect up front when the peer
+		# has already closed it, and resend once if a reused socket still fails
+		# before any reply arrived.
+		if transport.sock is not None and socket_dropped(transport.sock):
+			close()
+		reused = transport.sock is not None
+		state["responded"] = False
+		try:
+			return guarded_send(data)
+		except pyeapi.eapilib.ConnectionError:
+			if not reused or state["responded"] or not isinstance(connection.socket_error, RETRYABLE_ERRORS):
+				raise
+		state["responded"] = False
+		return guarded_send(data)
+
+	transport.close = lambda: None
+	transport.getresponse = guarded_getresponse
+	connection.send = retrying_send
+	return node
@@ -0,0 +1,236 @@
+"""Shared Ansible inventory loader for the eAPI scripts.
+
+The inventory is read in-process through the Ansible Python API
+(`InventoryManager`). When `ansible` is not importable, the loader falls back
+to `ansible-inventory -i <inventory> --list`.
+
+Either way, loading it is slow compared to the scripts themselves, so the result
+is cached on disk under `~/.cache/arista-lab-ceos/` and reused while it is fresh:
+- the cache is newer than the inventory file and its group_vars/host_vars,
+- and it is younger than `CACHE_TTL` seconds.
+
+Cached JSON is parsed with `orjson` when it is installed (optional).
+The parsed inventory is also kept in memory, so a script that loads the
+inventory more than once only parses it once. `refresh=True` (the scripts'
+`--refresh-inventory` option) skips both caches and reloads from Ansible.
+
+`fast=True` (`--fast-inventory`) parses a static YAML inventory directly with
+PyYAML instead of going through Ansible. Only the inventory file is read, so
+`ansible_host` must be set on the hosts there rather than in group_vars or
+host_vars. Plugin-based inventories and host ranges fall back to Ansible.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+try:
+	from orjson import loads as json_loads
+except ImportError:
+	from json import loads as json_loads
+
+
+CACHE_TTL = 300.0
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "arista-lab-ceos"
+
+_INVENTORIES: dict[str, dict] = {}
+_GROUP_HOSTS: dict[tuple[str, str], tuple[tuple[str, str], ...]] = {}
+
+
+def inventory_mtime(inventory_path: Path) -> float:
+	"""Return the newest mtime of the inventory file and its variable directories."""
+	mtime = inventory_path.stat().st_mtime
+	for vars_dir in ("group_vars", "host_vars"):
+		for path in (inventory_path.parent / vars_dir).rglob("*"):
+			mtime = max(mtime, path.stat().st_mtime)
+	return mtime
+
+
+def read_cached_inventory(cache_path: Path, inventory_path: Path) -> dict | None:
+	"""Return the cached inventory JSON, or None when it is missing or stale."""
+	try:
+		cache_mtime = cache_path.stat().st_mtime
+		if cache_mtime < inventory_mtime(inventory_path) or time.time() - cache_mtime >= CACHE_TTL:
+			return None
+		return json_loads(cache_path.read_bytes())
+	except (OSError, ValueError):
+		return None
+
+
+def write_cached_inventory(cache_path: Path, payload: str) -> None:
+	"""Atomically store inventory JSON; a failed write only costs the cache."""
+	try:
+		cache_path.parent.mkdir(parents=True, exist_ok=True)
+		with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_path.parent, delete=False) as tmp:
+			tmp.write(payload)
+		os.replace(tmp.name, cache_path)
+	except OSError:
+		pass
+
+
+def run_ansible_inventory(inventory_path: str) -> dict:
+	"""Return `ansible-inventory --list` output by running the CLI."""
+	cmd = ["ansible-inventory", "-i", inventory_path, "--list"]
+	proc = subprocess.run(cmd, capture_output=True, check=False)
+	if proc.returncode != 0:
+		raise RuntimeError(f"Failed to run ansible-inventory: {proc.stderr.decode(errors='replace').strip()}")
+	return json_loads(proc.stdout)
+
+
+def list_inventory(inventory_path: str) -> dict:
+	"""Return the inventory in `ansible-inventory --list` shape.
+
+	Hostvars are trimmed to `ansible_host`, the only variable the scripts use.
+	"""
+	try:
+		from ansible.inventory.manager import InventoryManager
+		from ansible.parsing.dataloader import DataLoader
+		from ansible.vars.manager import VariableManager
+	except ImportError:
+		return run_ansible_inventory(inventory_path)
+
+	loader = DataLoader()
+	manager = InventoryManager(loader=loader, sources=[inventory_path])
+	variables = VariableManager(loader=loader, inventory=manager)
+
+	inv: dict = {}
+	for name, group in manager.groups.items():
+		data = {}
+		if group.hosts:
+			data["hosts"] = [host.name for host in group.hosts]
+		if group.child_groups:
+			data["children"] = [child.name for child in group.child_groups]
+		inv[name] = data
+
+	# Resolve through VariableManager so group_vars/host_vars apply, as with the CLI.
+	hostvars = {}
+	for host in manager.get_hosts():
+		host_vars = variables.get_vars(host=host, include_hostvars=False, stage="all")
+		if "ansible_host" in host_vars:
+			hostvars[host.name] = {"ansible_host": str(host_vars["ansible_host"])}
+	inv["_meta"] = {"hostvars": hostvars}
+	return inv
+
+
+def parse_yaml_inventory(inventory_path: str) -> dict | None:
+	"""Return a static YAML inventory in `ansible-inventory --list` shape.
+
+	Returns None when the file needs Ansible to interpret it.
+	"""
+	try:
+		import yaml
+	except ImportError:
+		return None
+
+	try:
+		with open(inventory_path, encoding="utf-8") as handle:
+			data = yaml.load(handle, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+	except (OSError, yaml.YAMLError):
+		return None
+	if not isinstance(data, dict) or "plugin" in data:
+		return None
+
+	# A group may be listed under several parents; dicts keep its hosts and
+	# children unique and in file order.
+	groups: dict[str, tuple[dict, dict]] = {}
+	hostvars = {}
+	queue = deque(data.items())
+	while queue:
+		name, body = queue.popleft()
+		hosts, children = groups.setdefault(name, ({}, {}))
+		if not body:
+			continue
+		if not isinstance(body, dict):
+			return None
+		for host, host_vars in (body.get("hosts") or {}).items():
+			# Host ranges such as leaf[1:4] are expanded by Ansible only.
+			if "[" in host:
+				return None
+			hosts[host] = None
+			if isinstance(host_vars, dict) and "ansible_host" in host_vars:
+				hostvars[host] = {"ansible_host": str(host_vars["ansible_host"])}
+		child_groups = body.get("children") or {}
+		children.update(dict.fromkeys(child_groups))
+		queue.extend(child_groups.items())
+
+	inv: dict = {}
+	for name, (hosts, children) in groups.items():
+		entry = {}
+		if hosts:
+			entry["hosts"] = list(hosts)
+		if children:
+			entry["children"] = list(children)
+		inv[name] = entry
+	inv["_meta"] = {"hostvars": hostvars}
+	return inv
+
+
+def read_inventory(inventory_path: str, refresh: bool = False, fast: bool = False) -> dict:
+	"""Return the inventory from memory, the disk cache or Ansible."""
+	path = Path(inventory_path).resolve()
+	key = str(path)
+	if key in _INVENTORIES and not refresh:
+		return _INVENTORIES[key]
+
+	# Parsing the YAML is as cheap as reading the cache, so fast results are
+	# never written to it.
+	inv = parse_yaml_inventory(inventory_path) if fast else None
+	if inv is not None:
+		_INVENTORIES[key] = inv
+		return inv
+
+	cache_path = CACHE_DIR / f"inv-{hashlib.sha1(key.encode()).hexdigest()}.json"
+	inv = None if refresh else read_cached_inventory(cache_path, path)
+	if inv is None:
+		inv = list_inventory(inventory_path)
+		write_cached_inventory(cache_path, json.dumps(inv))
+
+	_INVENTORIES[key] = inv
+	return inv
+
+
+def collect_hosts(inv: dict, group: str) -> set[str]:
+	"""Collect hosts from a group and all of its child groups, breadth-first."""
+	seen = set()
+	hosts = set()
+	queue = deque([group])
+	while queue:
+		group_name = queue.popleft()
+		# Track visited groups to avoid loops in the group tree.
+		if group_name in seen:
+			continue
+		seen.add(group_name)
+
+		data = inv.get(group_name, {})
+		hosts.update(data.get("hosts", ()))
+		queue.extend(data.get("children", ()))
+	return hosts
+
+
+def load_inventory(
+	inventory_path: str, group: str, refresh: bool = False, fast: bool = False
+) -> list[tuple[str, str]]:
+	"""Load hosts from a group (including nested child groups).
+
+	Returns a sorted list of tuples: (inventory_hostname, ansible_host).
+	If `ansible_host` is missing, inventory hostname is used.
+	With `refresh`, the inventory is reloaded instead of read from a cache;
+	with `fast`, a static YAML inventory is parsed without Ansible.
+	"""
+	key = (str(Path(inventory_path).resolve()), group)
+	if refresh or key not in _GROUP_HOSTS:
+		inv = read_inventory(inventory_path, refresh, fast)
+		if group not in inv:
+			raise ValueError(f"Group '{group}' not found in inventory")
+
+		hostvars = inv.get("_meta", {}).get("hostvars", {})
+		_GROUP_HOSTS[key] = tuple(
+			(host, hostvars[host].get("ansible_host", host) if host in hostvars else host)
+			for host in sorted(collect_hosts(inv, group))
+		)
+	return list(_GROUP_HOSTS[key])
@@ -9,33 +9,31 @@ connects to each EOS device via eAPI, and prints:
 - EOS software version.
 
 Where device data comes from:
-- `ansible-inventory -i <inventory> --list` output (JSON)
+- the Ansible inventory, loaded and cached by `_inventory.py`
 - group membership (for example `FABRIC`)
 - `_meta.hostvars.<host>.ansible_host` as management IP/FQDN
 
 How connection works:
 - `pyeapi.client.connect(...)` creates a session to each device
 - the script executes `show hostname` and `show version`
+- devices are queried concurrently from a thread pool
 - values are read from eAPI JSON response and printed as a table
 """
 
 import argparse
-import json
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pyeapi
 
+from _eapi_cli import add_common_eapi_args
+from _inventory import load_inventory
+
 
 def parse_args() -> argparse.Namespace:
 	"""Define and parse CLI arguments."""
 	parser = argparse.ArgumentParser(description="Check hostname and EOS version via eAPI")
-	parser.add_argument("--inventory", default="inventory/inventory.yml", help="Path to Ansible inventory")
-	parser.add_argument("--group", default="FABRIC", help="Inventory group name")
-	parser.add_argument("--username", default="admin", help="eAPI username")
-	parser.add_argument("--password", default="admin", help="eAPI password")
-	parser.add_argument("--transport", choices=["http", "https"], default="https", help="eAPI transport")
-	parser.add_argument("--port", type=int, default=443, help="eAPI port")
+	add_common_eapi_args(parser, group="FABRIC")
 	return parser.parse_args()
 
 
@@ -58,48 +56,29 @@ def resolve_inventory_path(inventory_path: str) -> str:
 	return inventory_path
 
 
-def load_hosts(inventory_path: str, group: str) -> list[tuple[str, str]]:
-	"""Load hosts from a group (including nested child groups).
+def query_device(ip: str, args: argparse.Namespace) -> tuple[str, str]:
+	"""Connect to one device and return (device hostname, EOS version)."""
+	# Create pyeapi node session to the target device.
+	# transport=https + port=443 matches lab eAPI settings.
+	# Credentials come from CLI args (default admin/admin).
+	node = pyeapi.client.connect(
+		transport=args.transport,
+		host=ip,
+		username=args.username,
+		password=args.password,
+		port=args.port,
+		return_node=True,
+		timeout=30,
+	)
+	# Read software version from EOS via eAPI command execution.
+	version_response = node.enable(["show version"])[0]
+	version_data = version_response.get("result", version_response)
 
-	Returns a sorted list of tuples: (inventory_hostname, ansible_host).
+	# Read configured device hostname from EOS via eAPI command execution.
+	hostname_response = node.enable(["show hostname"])[0]
+	hostname_data = hostname_response.get("result", hostname_response)
 
-	Details:
-	- Inventory is parsed by shelling out to `ansible-inventory`.
-	- Hosts are collected recursively from the selected group and all children.
-	- For each host, connection target is resolved from `hostvars[host].ansible_host`.
-	  If `ansible_host` is missing, inventory hostname is used.
-	"""
-	# Query Ansible inventory and return full structure as JSON.
-	cmd = ["ansible-inventory", "-i", inventory_path, "--list"]
-	proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
-	inv = json.loads(proc.stdout)
-
-	if group not in inv:
-		raise ValueError(f"Group '{group}' not found in inventory")
-
-	# Track visited groups to avoid loops in recursive traversal.
-	visited = set()
-
-	def collect(group_name: str) -> set[str]:
-		"""Recursively collect hosts from a group and its children."""
-		if group_name in visited:
-			return set()
-		visited.add(group_name)
-
-		data = inv.get(group_name, {})
-		hosts = set(data.get("hosts", []))
-		for child in data.get("children", []):
-			hosts.update(collect(child))
-		return hosts
-
-	# hostvars carries per-host variables from inventory files (including ansible_host).
-	hostvars = inv.get("_meta", {}).get("hostvars", {})
-	result = []
-	for host in sorted(collect(group)):
-		# Resolve management endpoint used for eAPI connection.
-		ip = hostvars.get(host, {}).get("ansible_host", host)
-		result.append((host, ip))
-	return result
+	return hostname_data.get("hostname", "n/a"), version_data.get("version", "n/a")
 
 
 def main() -> int:
@@ -108,14 +87,16 @@ def main() -> int:
 	Flow:
 	1) Parse arguments.
 	2) Load hosts from inventory.
-	3) Connect to each host via eAPI.
+	3) Connect to each host via eAPI (concurrently).
 	4) Print hostname and EOS version table.
 	"""
 	args = parse_args()
 	inventory_path = resolve_inventory_path(args.inventory)
 
 	try:
-		hosts = load_hosts(inventory_path, args.group)
+		hosts = load_inventory(
+			inventory_path, args.group, refresh=args.refresh_inventory, fast=args.fast_inventory
+		)
 	except Exception as exc:
 		print(f"Inventory error: {exc}")
 		return 2
@@ -127,33 +108,16 @@ def main() -> int:
 	print(f"{'Inventory Host':<15} {'Hostname (device)':<20} {'EOS Version':<35}")
 	print("-" * 75)
 
-	for inventory_host, ip in hosts:
-		try:
-			# Create pyeapi node session to the target device.
-			# transport=https + port=443 matches lab eAPI settings.
-			# Credentials come from CLI args (default admin/admin).
-			node = pyeapi.client.connect(
-				transport=args.transport,
-				host=ip,
-				username=args.username,
-				password=args.password,
-				port=args.port,
-				return_node=True,
-				timeout=30,
-			)
-			# Read software version from EOS via eAPI command execution.
-			version_response = node.enable(["show version"])[0]
-			version_data = version_response.get("result", version_response)
-
-			# Read configured device hostname from EOS via eAPI command execution.
-			hostname_response = node.enable(["show hostname"])[0]
-			hostname_data = hostname_response.get("result", hostname_response)
-
-			hostname = hostname_data.get("hostname", "n/a")
-			version = version_data.get("version", "n/a")
-			print(f"{inventory_host:<15} {hostname:<20} {version:<35}")
-		except Exception as exc:
-			print(f"{inventory_host:<15} {'ERROR':<20} {str(exc):<35}")
+	# Each device is independent, so query them all in parallel and print
+	# results in inventory order as they become available.
+	with ThreadPoolExecutor(max_workers=min(args.max_workers, len(hosts))) as executor:
+		futures = [executor.submit(query_device, ip, args) for _, ip in hosts]
+		for (inventory_host, _), future in zip(hosts, futures):
+			try:
+				hostname, version = future.result()
+				print(f"{inventory_host:<15} {hostname:<20} {version:<35}")
+			except Exception as exc:
+				print(f"{inventory_host:<15} {'ERROR':<20} {str(exc):<35}")
 
 	return 0
 
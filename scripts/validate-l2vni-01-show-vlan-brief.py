@@ -1,28 +1,31 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import re
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pyeapi
 
+from _eapi_cli import add_common_eapi_args
+from _inventory import load_inventory
+
 
 YELLOW = "\033[33m"
 GREEN = "\033[32m"
 RESET = "\033[0m"
+USE_COLOR = sys.stdout.isatty()
+
+# One multiline pattern matches every VLAN line in a single scan of the output.
+# [^\S\n] is whitespace that cannot run on into the next line.
+VLAN_LINE_RE = re.compile(r"^[^\S\n]*\d{2}[^\S\n]+.*$", re.MULTILINE)
+VLAN_LINE_COLOR = f"{GREEN}\\g<0>{RESET}"
 
 
 def parse_args() -> argparse.Namespace:
 	parser = argparse.ArgumentParser(description="Run 'show vlan brief' on all leafs via eAPI")
-	parser.add_argument("--inventory", default="inventory/inventory.yml", help="Path to Ansible inventory")
-	parser.add_argument("--group", default="DC1_L3_LEAVES", help="Inventory group with leaf devices")
-	parser.add_argument("--username", default="admin", help="eAPI username")
-	parser.add_argument("--password", default="admin", help="eAPI password")
-	parser.add_argument("--transport", choices=["http", "https"], default="https", help="eAPI transport")
-	parser.add_argument("--port", type=int, default=443, help="eAPI port")
+	add_common_eapi_args(parser, group="DC1_L3_LEAVES")
 	return parser.parse_args()
 
 
@@ -40,35 +43,6 @@ def resolve_inventory_path(inventory_path: str) -> str:
 	return inventory_path
 
 
-def load_hosts(inventory_path: str, group: str) -> list[tuple[str, str]]:
-	cmd = ["ansible-inventory", "-i", inventory_path, "--list"]
-	proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
-	inv = json.loads(proc.stdout)
-
-	if group not in inv:
-		raise ValueError(f"Group '{group}' not found in inventory")
-
-	visited = set()
-
-	def collect(group_name: str) -> set[str]:
-		if group_name in visited:
-			return set()
-		visited.add(group_name)
-
-		data = inv.get(group_name, {})
-		hosts = set(data.get("hosts", []))
-		for child in data.get("children", []):
-			hosts.update(collect(child))
-		return hosts
-
-	hostvars = inv.get("_meta", {}).get("hostvars", {})
-	result = []
-	for host in sorted(collect(group)):
-		ip = hostvars.get(host, {}).get("ansible_host", host)
-		result.append((host, ip))
-	return result
-
-
 def get_output(response: dict) -> str:
 	result = response.get("result")
 	if isinstance(result, dict):
@@ -84,24 +58,30 @@ def get_output(response: dict) -> str:
 
 
 def colorize(text: str, color: str) -> str:
-	if not sys.stdout.isatty():
+	if not USE_COLOR:
 		return text
 	return f"{color}{text}{RESET}"
 
 
 def colorize_vlan_output(output: str) -> str:
 	"""Highlight two-digit VLAN entries (10-99) in green."""
-	lines = []
-	vlan_line_re = re.compile(r"^\s*(\d{2})\s+")
+	if not USE_COLOR:
+		return output
+	return VLAN_LINE_RE.sub(VLAN_LINE_COLOR, output)
 
-	for line in output.splitlines():
-		match = vlan_line_re.match(line)
-		if match:
-			lines.append(colorize(line, GREEN))
-		else:
-			lines.append(line)
 
-	return "\n".join(lines)
+def show_vlan_brief(ip: str, args: argparse.Namespace) -> str:
+	node = pyeapi.client.connect(
+		transport=args.transport,
+		host=ip,
+		username=args.username,
+		password=args.password,
+		port=args.port,
+		return_node=True,
+		timeout=30,
+	)
+	response = node.enable(["show vlan brief"], encoding="text")[0]
+	return get_output(response)
 
 
 def main() -> int:
@@ -109,7 +89,9 @@ def main() -> int:
 	inventory_path = resolve_inventory_path(args.inventory)
 
 	try:
-		hosts = load_hosts(inventory_path, args.group)
+		hosts = load_inventory(
+			inventory_path, args.group, refresh=args.refresh_inventory, fast=args.fast_inventory
+		)
 	except Exception as exc:
 		print(f"Inventory error: {exc}")
 		return 2
@@ -119,24 +101,16 @@ def main() -> int:
 		return 2
 
 	failures = 0
-	for inventory_host, ip in hosts:
-		header = f"\n{'=' * 20} {inventory_host} ({ip}) {'=' * 20}"
-		print(colorize(header, YELLOW))
-		try:
-			node = pyeapi.client.connect(
-				transport=args.transport,
-				host=ip,
-				username=args.username,
-				password=args.password,
-				port=args.port,
-				return_node=True,
-				timeout=30,
-			)
-			response = node.enable(["show vlan brief"], encoding="text")[0]
-			print(colorize_vlan_output(get_output(response).rstrip()))
-		except Exception as exc:
-			failures += 1
-			print(f"ERROR: {exc}")
+	with ThreadPoolExecutor(max_workers=min(args.max_workers, len(hosts))) as executor:
+		futures = [executor.submit(show_vlan_brief, ip, args) for _, ip in hosts]
+		for (inventory_host, ip), future in zip(hosts, futures):
+			header = f"\n{'=' * 20} {inventory_host} ({ip}) {'=' * 20}"
+			print(colorize(header, YELLOW))
+			try:
+				print(colorize_vlan_output(future.result().rstrip()))
+			except Exception as exc:
+				failures += 1
+				print(f"ERROR: {exc}")
 
 	return 1 if failures else 0
 
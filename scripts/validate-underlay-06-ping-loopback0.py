@@ -1,68 +1,70 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
+import functools
+import os
 import re
-import subprocess
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import pyeapi
 
+from _eapi_cli import add_common_eapi_args
+from _eapi_session import keep_alive, set_timeout, shared_ssl_context
+from _inventory import load_inventory
 
-def parse_args() -> argparse.Namespace:
-	parser = argparse.ArgumentParser(description="Ping all Loopback0 addresses between leafs")
-	parser.add_argument("--inventory", default="inventory/inventory.yml", help="Path to Ansible inventory")
-	parser.add_argument("--group", default="DC1_L3_LEAVES", help="Inventory group with leaf devices")
-	parser.add_argument("--username", default="admin", help="eAPI username")
-	parser.add_argument("--password", default="admin", help="eAPI password")
-	parser.add_argument("--transport", choices=["http", "https"], default="https", help="eAPI transport")
-	parser.add_argument("--port", type=int, default=443, help="eAPI port")
-	parser.add_argument("--repeat", type=int, default=3, help="Ping repeat count")
-	parser.add_argument("--timeout", type=int, default=2, help="Ping timeout in seconds")
-	return parser.parse_args()
 
+# Socket timeout for a single eAPI request, and the margin added on top of the
+# expected run time of a ping batch.
+EAPI_TIMEOUT = 30
 
-def resolve_inventory_path(inventory_path: str) -> str:
-	path = Path(inventory_path)
-	if path.is_file():
-		return str(path)
+# Sent to every leaf in a single eAPI request; add further pre-checks here.
+COLLECT_COMMANDS = ["show ip interface Loopback0"]
 
-	script_dir = Path(__file__).resolve().parent
-	repo_root = script_dir.parent
-	candidate = repo_root / inventory_path
-	if candidate.is_file():
-		return str(candidate)
+# With fail-fast, each source first pings this many destinations on their own;
+# if none of them gets a single reply while another source reaches one of them,
+# the rest of its row is skipped.
+FAIL_FAST_PROBES = 2
 
-	return inventory_path
+ROW_FORMAT = "{:<14} {:<16} {:<14} {:<16} {} - {}".format
 
+CISCO_PING_RE = re.compile(r"Success rate is\s+(\d+) percent\s+\((\d+)/(\d+)\)", re.ASCII)
+LINUX_PING_RE = re.compile(
+	r"(\d+) packets transmitted,\s*(\d+) received,\s*(\d+)% packet loss",
+	re.ASCII | re.IGNORECASE,
+)
 
-def load_hosts(inventory_path: str, group: str) -> list[tuple[str, str]]:
-	cmd = ["ansible-inventory", "-i", inventory_path, "--list"]
-	proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
-	inv = json.loads(proc.stdout)
 
-	if group not in inv:
-		raise ValueError(f"Group '{group}' not found in inventory")
+def parse_args() -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Ping all Loopback0 addresses between leafs")
+	add_common_eapi_args(parser, group="DC1_L3_LEAVES")
+	parser.add_argument("--repeat", type=int, default=3, help="Ping repeat count")
+	parser.add_argument("--timeout", type=int, default=2, help="Ping timeout in seconds")
+	parser.add_argument(
+		"--no-fail-fast",
+		action="store_true",
+		help="Ping every destination even after a source's first pings got no replies",
+	)
+	parser.add_argument(
+		"--matrix",
+		choices=["full", "undirected", "hub"],
+		default="undirected",
+		help="Ping every ordered pair (full), every pair once (undirected), or only to and from the first leaf (hub)",
+	)
+	return parser.parse_args()
 
-	visited = set()
 
-	def collect(group_name: str) -> set[str]:
-		if group_name in visited:
-			return set()
-		visited.add(group_name)
+@functools.lru_cache(maxsize=None)
+def resolve_inventory_path(inventory_path: str) -> str:
+	# Absolute paths cannot be re-rooted, so they are used as given.
+	if os.path.isabs(inventory_path) or os.path.isfile(inventory_path):
+		return inventory_path
 
-		data = inv.get(group_name, {})
-		hosts = set(data.get("hosts", []))
-		for child in data.get("children", []):
-			hosts.update(collect(child))
-		return hosts
+	repo_root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+	candidate = os.path.join(repo_root, inventory_path)
+	if os.path.isfile(candidate):
+		return candidate
 
-	hostvars = inv.get("_meta", {}).get("hostvars", {})
-	result = []
-	for host in sorted(collect(group)):
-		ip = hostvars.get(host, {}).get("ansible_host", host)
-		result.append((host, ip))
-	return result
+	return inventory_path
 
 
 def connect_node(ip: str, args: argparse.Namespace):
@@ -73,52 +75,159 @@ def connect_node(ip: str, args: argparse.Namespace):
 		password=args.password,
 		port=args.port,
 		return_node=True,
-		timeout=30,
+		timeout=EAPI_TIMEOUT,
+		context=shared_ssl_context(),
 	)
 
 
-def get_text_output(response: dict) -> str:
-	result = response.get("result")
-	if isinstance(result, dict):
-		if isinstance(result.get("output"), str):
-			return result["output"]
-		if isinstance(result.get("response"), str):
-			return result["response"]
-	if isinstance(response.get("output"), str):
-		return response["output"]
-	if isinstance(response.get("response"), str):
-		return response["response"]
-	return str(response)
-
-
-def get_loopback0_ip(node) -> str:
-	response = node.enable(["show ip interface Loopback0"], encoding="text")[0]
-	output = get_text_output(response)
-	match = re.search(r"Internet address is\s+(\d+\.\d+\.\d+\.\d+)/\d+", output)
-	if not match:
+def collect_outputs(node) -> dict[str, dict]:
+	# strict=True sends the whole list in one eAPI request; without it pyeapi
+	# posts one request per command.
+	responses = node.enable(COLLECT_COMMANDS, strict=True)
+	return {command: response["result"] for command, response in zip(COLLECT_COMMANDS, responses)}
+
+
+def get_loopback0_ip(outputs: dict[str, dict]) -> str:
+	interface = outputs["show ip interface Loopback0"].get("interfaces", {}).get("Loopback0", {})
+	address = interface.get("interfaceAddress", {}).get("primaryIp", {}).get("address")
+	if not address or address == "0.0.0.0":
 		raise ValueError("Unable to parse Loopback0 IP")
-	return match.group(1)
+	return address
+
 
+def collect_loopback0_ip(node) -> str:
+	return get_loopback0_ip(collect_outputs(node))
 
-def parse_ping_success(output: str) -> tuple[bool, str]:
-	match = re.search(r"Success rate is\s+(\d+) percent\s+\((\d+)/(\d+)\)", output)
+
+def parse_ping_success(output: str) -> tuple[bool, int | None, str]:
+	# Returns (ok, replies received, message); received is None if unparsable.
+	match = CISCO_PING_RE.search(output)
 	if not match:
-		linux_match = re.search(
-			r"(\d+) packets transmitted,\s*(\d+) received,\s*(\d+)% packet loss",
-			output,
-			re.IGNORECASE,
-		)
+		linux_match = LINUX_PING_RE.search(output)
 		if linux_match:
 			tx = int(linux_match.group(1))
 			rx = int(linux_match.group(2))
 			loss = int(linux_match.group(3))
 			ok = tx > 0 and loss == 0 and rx == tx
-			return ok, f"Packet loss {loss}% ({rx}/{tx})"
-		return False, "Could not parse ping result"
+			return ok, rx, f"Packet loss {loss}% ({rx}/{tx})"
+		return False, None, "Could not parse ping result"
 
 	percent = int(match.group(1))
 	ok = percent == 100
-	return ok, f"Success rate {percent}% ({match.group(2)}/{match.group(3)})"
+	return ok, int(match.group(2)), f"Success rate {percent}% ({match.group(2)}/{match.group(3)})"
+
+
+def ping_destinations(leaves: list[str], matrix: str) -> dict[str, list[str]]:
+	# Map each source leaf to the leafs it pings for the selected matrix.
+	if matrix == "hub":
+		hub, *spokes = leaves
+		return {hub: spokes, **{spoke: [hub] for spoke in spokes}}
+	if matrix == "undirected":
+		return {src: leaves[index + 1 :] for index, src in enumerate(leaves[:-1])}
+	return {src: [dst for dst in leaves if dst != src] for src in leaves}
+
+
+def run_pings(
+	node, dst_loopback0_ips: list[str], args: argparse.Namespace, repeat: int
+) -> list[tuple[bool, int | None, str]]:
+	# All pings go out in a single eAPI request (strict=True); the switch runs
+	# them one after another.
+	cmds = [f"ping {dst} source Loopback0 repeat {repeat} timeout {args.timeout}" for dst in dst_loopback0_ips]
+	# Each ping can take about repeat * timeout (at least 1 s per echo), and the
+	# reply only comes once the last one is done.
+	set_timeout(node, EAPI_TIMEOUT + len(cmds) * repeat * max(args.timeout, 1))
+	responses = node.enable(cmds, strict=True)
+	# EOS has no structured ping model: the JSON result carries the CLI text in "messages".
+	return [parse_ping_success("".join(response["result"].get("messages", ()))) for response in responses]
+
+
+def fail_fast_probe_count(dst_loopback0_ips: list[str], args: argparse.Namespace) -> int:
+	# Number of leading destinations a source pings before the rest of its row.
+	if args.no_fail_fast or len(dst_loopback0_ips) <= FAIL_FAST_PROBES:
+		return len(dst_loopback0_ips)
+	return FAIL_FAST_PROBES
+
+
+def run_ping_rows(
+	executor: ThreadPoolExecutor, nodes: dict, rows: dict[str, list[str]], args: argparse.Namespace, repeat: int
+) -> dict[str, list[tuple[bool, int | None, str] | Exception]]:
+	# One run_pings task per source; a failed request marks that source's whole batch.
+	futures = {src: executor.submit(run_pings, nodes[src], dsts, args, repeat) for src, dsts in rows.items() if dsts}
+	results = {}
+	for src, future in futures.items():
+		try:
+			results[src] = future.result()
+		except Exception as exc:
+			results[src] = [exc] * len(rows[src])
+	return results
+
+
+def ping_pass(
+	executor: ThreadPoolExecutor,
+	nodes: dict,
+	rows: dict[str, list[str]],
+	args: argparse.Namespace,
+	repeat: int,
+	reached: set[str],
+) -> dict[str, list[tuple[bool, str] | Exception | None]]:
+	# Returns one result per destination and source; None marks a destination
+	# skipped by fail-fast. Every source pings its probe destinations first. A
+	# source whose probes all got no reply has most likely lost its uplinks, and
+	# every further ping would wait out repeat * timeout for nothing. It is only
+	# skipped when some other source did reach one of those destinations, so a
+	# dead destination is not blamed on every source that probes it. `reached`
+	# collects the destinations that replied and carries over between passes.
+	probes = {src: dsts[: fail_fast_probe_count(dsts, args)] for src, dsts in rows.items()}
+	results = run_ping_rows(executor, nodes, probes, args, repeat)
+	probe_reached = {
+		dst
+		for src, dsts in probes.items()
+		for dst, result in zip(dsts, results.get(src, ()))
+		if not isinstance(result, Exception) and result[1]
+	}
+	reached |= probe_reached
+
+	rest = {}
+	for src, dsts in rows.items():
+		done = results.setdefault(src, [])
+		if len(done) == len(dsts):
+			continue
+		if any(isinstance(result, Exception) for result in done):
+			done += [done[0]] * (len(dsts) - len(done))
+		elif all(result[1] == 0 for result in done) and reached.intersection(probes[src]):
+			done += [None] * (len(dsts) - len(done))
+		else:
+			rest[src] = dsts[len(done) :]
+	for src, rest_results in run_ping_rows(executor, nodes, rest, args, repeat).items():
+		results[src] += rest_results
+		reached.update(dst for dst, result in zip(rest[src], rest_results) if not isinstance(result, Exception) and result[1])
+
+	return {
+		src: [result if result is None or isinstance(result, Exception) else (result[0], result[2]) for result in row]
+		for src, row in results.items()
+	}
+
+
+def ping_loopback0s(
+	executor: ThreadPoolExecutor, nodes: dict, rows: dict[str, list[str]], args: argparse.Namespace
+) -> dict[str, list[tuple[bool, str] | Exception | None]]:
+	# A single echo per destination is enough for healthy pairs. Only failed or
+	# skipped destinations are pinged again with the full --repeat count, and that
+	# second result is the one reported. If the retry itself fails, only the
+	# retried destinations are reported as errors.
+	reached: set[str] = set()
+	results = ping_pass(executor, nodes, rows, args, 1, reached)
+	if args.repeat > 1:
+		retry = {
+			src: [index for index, result in enumerate(row) if result is None or (isinstance(result, tuple) and not result[0])]
+			for src, row in results.items()
+		}
+		retry_rows = {src: [rows[src][index] for index in indices] for src, indices in retry.items() if indices}
+		retried = ping_pass(executor, nodes, retry_rows, args, args.repeat, reached)
+		for src, row in retried.items():
+			for index, result in zip(retry[src], row):
+				results[src][index] = result
+	return results
 
 
 def main() -> int:
@@ -126,7 +235,9 @@ def main() -> int:
 	inventory_path = resolve_inventory_path(args.inventory)
 
 	try:
-		hosts = load_hosts(inventory_path, args.group)
+		hosts = load_inventory(
+			inventory_path, args.group, refresh=args.refresh_inventory, fast=args.fast_inventory
+		)
 	except Exception as exc:
 		print(f"Inventory error: {exc}")
 		return 2
@@ -135,50 +246,59 @@ def main() -> int:
 		print("Need at least two leafs in the selected group.")
 		return 2
 
-	leaf_nodes = {}
+	# One kept-alive node per leaf, shared by the collection and ping phases.
+	# Each phase runs at most one task per leaf, so no node is used concurrently.
+	leaf_nodes = {leaf: keep_alive(connect_node(ip, args)) for leaf, ip in hosts}
 	loopback0_ips = {}
 	failures = 0
 
 	print("Collecting Loopback0 IPs...")
-	for leaf, ip in hosts:
-		try:
-			node = connect_node(ip, args)
-			leaf_nodes[leaf] = node
-			loopback0_ip = get_loopback0_ip(node)
-			loopback0_ips[leaf] = loopback0_ip
-			print(f"  {leaf:<12} -> {loopback0_ip}")
-		except Exception as exc:
-			failures += 1
-			print(f"  {leaf:<12} -> ERROR: {exc}")
+	lines = []
+	with ThreadPoolExecutor(max_workers=min(args.max_workers, len(hosts))) as executor:
+		futures = [executor.submit(collect_loopback0_ip, leaf_nodes[leaf]) for leaf, _ in hosts]
+		for (leaf, _), future in zip(hosts, futures):
+			try:
+				loopback0_ip = future.result()
+				loopback0_ips[leaf] = loopback0_ip
+				lines.append(f"  {leaf:<12} -> {loopback0_ip}")
+			except Exception as exc:
+				failures += 1
+				lines.append(f"  {leaf:<12} -> ERROR: {exc}")
+	print("\n".join(lines))
 
 	if len(loopback0_ips) < 2:
 		print("Not enough valid Loopback0 addresses to run matrix ping.")
 		return 2
 
-	print("\nPinging Loopback0-to-Loopback0 between all leafs:")
+	print(f"\nPinging Loopback0-to-Loopback0 between all leafs ({args.matrix} matrix):")
 	print("-" * 78)
 	print(f"{'Source':<14} {'Source Lo0':<16} {'Destination':<14} {'Dest Lo0':<16} Result")
 	print("-" * 78)
 
-	for src_leaf, src_node in leaf_nodes.items():
-		if src_leaf not in loopback0_ips:
-			continue
-		for dst_leaf, dst_loopback0_ip in loopback0_ips.items():
-			if src_leaf == dst_leaf:
-				continue
-			try:
-				cmd = f"ping {dst_loopback0_ip} source Loopback0 repeat {args.repeat} timeout {args.timeout}"
-				response = src_node.enable([cmd], encoding="text")[0]
-				output = get_text_output(response)
-				ok, message = parse_ping_success(output)
+	destinations = ping_destinations(list(loopback0_ips), args.matrix)
+
+	# Sources ping concurrently; rows are collected in matrix order and the table
+	# is written in one go once every source has finished.
+	ping_rows = {src_leaf: [loopback0_ips[dst] for dst in dst_leaves] for src_leaf, dst_leaves in destinations.items()}
+	with ThreadPoolExecutor(max_workers=min(args.max_workers, len(destinations))) as executor:
+		ping_results = ping_loopback0s(executor, leaf_nodes, ping_rows, args)
+
+	rows = []
+	for src_leaf, dst_leaves in destinations.items():
+		results = ping_results[src_leaf]
+		for dst_leaf, result in zip(dst_leaves, results):
+			if isinstance(result, Exception):
+				state, message = "ERROR", result
+			elif result is None:
+				state, message = "SKIP", "skipped remaining destinations after total loss"
+			else:
+				ok, message = result
 				state = "PASS" if ok else "FAIL"
-				if not ok:
-					failures += 1
-				print(f"{src_leaf:<14} {loopback0_ips[src_leaf]:<16} {dst_leaf:<14} {dst_loopback0_ip:<16} {state} - {message}")
-			except Exception as exc:
+			if state != "PASS":
 				failures += 1
-				print(f"{src_leaf:<14} {loopback0_ips[src_leaf]:<16} {dst_leaf:<14} {dst_loopback0_ip:<16} ERROR - {exc}")
+			rows.append((src_leaf, loopback0_ips[src_leaf], dst_leaf, loopback0_ips[dst_leaf], state, message))
 
+	print("\n".join(ROW_FORMAT(*row) for row in rows))
 	print("-" * 78)
 	if failures:
 		print(f"Completed with {failures} issue(s).")